@@ -0,0 +1,393 @@
+"""Offline maintenance commands that run without the web app or scheduler.
+
+    python -m app.cli backfill dump1.xml export.jsonl --classify
+    python -m app.cli reclassify --since 2025-01-01 --until 2025-02-01
+    python -m app.cli bench-startup
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import feedparser
+
+from app.config import settings
+from app.database import close_db, get_db
+from app.services.classifier import BATCH_SIZE, classify_tweets
+from app.services.rss_poller import _parse_entry
+
+logger = logging.getLogger("app.cli")
+
+# Rows checked for duplicates per query; kept under SQLite's bound-variable limit
+LOOKUP_CHUNK = 900
+# Rows inserted per transaction
+COMMIT_EVERY = 10000
+# Tweets loaded and classified per checkpoint step
+RECLASSIFY_CHUNK = BATCH_SIZE * 20
+
+
+def _parse_timestamp(value: str) -> datetime | None:
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _tweet_from_json(obj: dict) -> dict | None:
+    """Accept either an exported tweet row or a raw feed entry serialised as JSON.
+
+    Exported rows keep their category, reason and confidence. fetched_at is not
+    kept: backfill stamps every row it loads with its own time to find them again.
+    """
+    if "content_text" in obj and obj.get("id"):
+        media_urls = obj.get("media_urls") or []
+        if not isinstance(media_urls, str):
+            media_urls = json.dumps(media_urls)
+        return {
+            "id": obj["id"],
+            "author": obj.get("author", ""),
+            "content": obj.get("content", ""),
+            "content_text": obj.get("content_text", ""),
+            "media_urls": media_urls,
+            "tweet_url": obj.get("tweet_url", ""),
+            "published_at": obj.get("published_at"),
+            "category": obj.get("category"),
+            "category_reason": obj.get("category_reason"),
+            "confidence": obj.get("confidence"),
+        }
+
+    entry = feedparser.FeedParserDict(obj)
+    tweet = _parse_entry(entry)
+    if not entry.get("published_parsed") and entry.get("published"):
+        # Serialised entries lose feedparser's parsed date, so parse the raw one here
+        published = _parse_timestamp(entry["published"])
+        if published:
+            tweet["published_at"] = published.astimezone(timezone.utc).isoformat()
+    return tweet if tweet["id"] else None
+
+
+def iter_file(path: str):
+    """Yield tweets from an RSS/Atom dump or a JSONL file, one at a time."""
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    tweet = _tweet_from_json(json.loads(line))
+                except json.JSONDecodeError as e:
+                    logger.warning(f"{path}:{line_no}: skipping invalid JSON ({e})")
+                    continue
+                if tweet:
+                    yield tweet
+        return
+
+    feed = feedparser.parse(path)
+    if feed.bozo and not feed.entries:
+        logger.error(f"Could not parse {path}: {feed.bozo_exception}")
+        return
+    for entry in feed.entries:
+        tweet = _parse_entry(entry)
+        if tweet["id"]:
+            yield tweet
+
+
+async def _insert_chunk(db, chunk: list[dict], fetched_at: str) -> int:
+    # Drop duplicates within the chunk as well as those already stored
+    unique = {t["id"]: t for t in chunk}
+    ids = list(unique)
+    placeholders = ",".join("?" for _ in ids)
+    rows = await db.execute_fetchall(
+        f"SELECT id FROM tweets WHERE id IN ({placeholders})", ids
+    )
+    existing = {row[0] for row in rows}
+    new = [t for tweet_id, t in unique.items() if tweet_id not in existing]
+
+    await db.executemany(
+        """INSERT OR IGNORE INTO tweets (id, author, content, content_text, media_urls, tweet_url, published_at,
+                                         fetched_at, category, category_reason, confidence)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (
+                t["id"],
+                t["author"],
+                t["content"],
+                t["content_text"],
+                t["media_urls"],
+                t["tweet_url"],
+                t["published_at"],
+                fetched_at,
+                t.get("category"),
+                t.get("category_reason"),
+                t.get("confidence"),
+            )
+            for t in new
+        ],
+    )
+    return len(new)
+
+
+async def _fetch_batches(db, where: str, params: list, chunk: int, last_rowid: int = 0):
+    """Yield tweets matching `where` in rowid order, chunk by chunk."""
+    while True:
+        rows = await db.execute_fetchall(
+            f"""SELECT rowid, id, author, content_text, media_urls FROM tweets
+                WHERE {where} AND rowid > ? ORDER BY rowid LIMIT ?""",
+            [*params, last_rowid, chunk],
+        )
+        if not rows:
+            return
+        last_rowid = rows[-1][0]
+        yield [dict(row) for row in rows]
+
+
+async def backfill(paths: list[str], classify: bool, concurrency: int, pending: bool):
+    db = await get_db()
+    # Bulk loading doesn't need an fsync per transaction
+    await db.execute("PRAGMA synchronous=NORMAL")
+
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    start_rowid = (await db.execute_fetchall("SELECT COALESCE(MAX(rowid), 0) FROM tweets"))[0][0]
+    seen = inserted = uncommitted = 0
+    started = time.monotonic()
+
+    for path in paths:
+        chunk = []
+        for tweet in iter_file(path):
+            chunk.append(tweet)
+            if len(chunk) >= LOOKUP_CHUNK:
+                count = await _insert_chunk(db, chunk, fetched_at)
+                seen += len(chunk)
+                inserted += count
+                uncommitted += count
+                chunk = []
+                if uncommitted >= COMMIT_EVERY:
+                    await db.commit()
+                    uncommitted = 0
+                    logger.info(f"{inserted} inserted / {seen} read")
+        if chunk:
+            inserted += await _insert_chunk(db, chunk, fetched_at)
+            seen += len(chunk)
+        await db.commit()
+        uncommitted = 0
+        logger.info(f"Finished {path}: {inserted} inserted / {seen} read so far")
+
+    logger.info(
+        f"Backfill loaded {inserted} new tweets out of {seen} in {time.monotonic() - started:.1f}s"
+    )
+    if not inserted:
+        return
+
+    where = "rowid > ? AND fetched_at = ?"
+    params = [start_rowid, fetched_at]
+
+    if not pending:
+        # Keep history out of the next scheduled briefing by filing it as its own briefing
+        span = await db.execute_fetchall(
+            f"SELECT MIN(published_at), MAX(published_at), COUNT(*) FROM tweets WHERE {where}",
+            params,
+        )
+        period_start, period_end, count = span[0]
+        cursor = await db.execute(
+            """INSERT INTO briefings (generated_at, period_start, period_end, tweet_count, summary)
+               VALUES (?, ?, ?, ?, ?)""",
+            (fetched_at, period_start, period_end, count, ""),
+        )
+        await db.execute(
+            f"UPDATE tweets SET briefing_id = ? WHERE {where}",
+            [cursor.lastrowid, *params],
+        )
+        await db.commit()
+        logger.info(f"Filed backfilled tweets as briefing #{cursor.lastrowid}")
+
+    if classify:
+        # Tweets loaded from an export may already carry their labels
+        async for batch in _fetch_batches(db, f"{where} AND category IS NULL", params, RECLASSIFY_CHUNK):
+            await classify_tweets(batch, concurrency=concurrency)
+
+
+def _checkpoint_path() -> str:
+    return os.path.join(
+        os.path.dirname(settings.database_path) or ".", "reclassify-checkpoint.json"
+    )
+
+
+async def reclassify(since: str, until: str, concurrency: int, restart: bool) -> bool:
+    """Returns False if it stopped on a failed batch; rerunning resumes from there."""
+    db = await get_db()
+    path = _checkpoint_path()
+
+    last_rowid = 0
+    if os.path.exists(path) and not restart:
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("since") == since and checkpoint.get("until") == until:
+            last_rowid = checkpoint["last_rowid"]
+            logger.info(f"Resuming from checkpoint at rowid {last_rowid}")
+
+    where = "published_at >= ? AND published_at < ?"
+    total = (await db.execute_fetchall(
+        f"SELECT COUNT(*) FROM tweets WHERE {where} AND rowid > ?", (since, until, last_rowid)
+    ))[0][0]
+    logger.info(f"Reclassifying {total} tweets published in [{since}, {until})")
+
+    done = 0
+    started = time.monotonic()
+    async for batch in _fetch_batches(db, where, [since, until], RECLASSIFY_CHUNK, last_rowid):
+        failed = set(await classify_tweets(batch, concurrency=concurrency, overwrite=True))
+        # Only move the checkpoint past the run of tweets before the first failure
+        succeeded = batch
+        if failed:
+            first = next(i for i, t in enumerate(batch) if t["id"] in failed)
+            succeeded = batch[:first]
+        if succeeded:
+            done += len(succeeded)
+            with open(path, "w") as f:
+                json.dump({"since": since, "until": until, "last_rowid": succeeded[-1]["rowid"]}, f)
+        rate = done / max(time.monotonic() - started, 1e-6)
+        logger.info(f"{done}/{total} reclassified ({rate:.0f} tweets/s)")
+        if failed:
+            logger.error(f"{len(failed)} tweets failed to classify, stopping; rerun to resume")
+            return False
+
+    if os.path.exists(path):
+        os.remove(path)
+    return True
+
+
+def _import_times(module: str) -> list[tuple[str, int]]:
+    """Cumulative import time in microseconds per module, from python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(cumulative)))
+    return times
+
+
+def bench_startup(top: int, timeout: float):
+    """Report import cost and time from process start to the first HTTP response."""
+    import httpx
+
+    print("== Import time ==")
+    try:
+        times = _import_times("app.main")
+    except RuntimeError as e:
+        print(f"import app.main failed: {e}")
+        return
+    by_name = dict(times)
+    print(f"app.main: {by_name.get('app.main', 0) / 1000:.1f} ms")
+    # Report the heaviest third-party packages rather than every submodule
+    roots = {}
+    for name, us in times:
+        root = name.split(".")[0]
+        if name == root:
+            roots[root] = max(roots.get(root, 0), us)
+    for name, us in sorted(roots.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {name:<30} {us / 1000:8.1f} ms")
+    for name in ("google.genai", "feedparser", "apscheduler", "numpy"):
+        status = "imported" if name in by_name else "deferred"
+        print(f"  {name:<30} {status}")
+
+    print("== Time to first response ==")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.monotonic() - started < timeout:
+            if server.poll() is not None:
+                print(f"server exited with code {server.returncode}")
+                return
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/static/style.css", timeout=1)
+            except httpx.TransportError:
+                time.sleep(0.02)
+                continue
+            print(f"first response after {(time.monotonic() - started) * 1000:.0f} ms")
+            return
+        print(f"no response within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _date_arg(value: str) -> str:
+    dt = _parse_timestamp(value)
+    if dt is None:
+        raise argparse.ArgumentTypeError(f"not a date: {value}")
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_backfill = sub.add_parser("backfill", help="Load archived RSS/Atom dumps or JSONL exports")
+    p_backfill.add_argument("paths", nargs="+")
+    p_backfill.add_argument("--classify", action="store_true", help="Classify the loaded tweets")
+    p_backfill.add_argument(
+        "--pending", action="store_true",
+        help="Leave loaded tweets for the next briefing instead of filing them as their own",
+    )
+    p_backfill.add_argument("--concurrency", type=int, default=4)
+
+    p_reclassify = sub.add_parser("reclassify", help="Rerun LLM classification over a date range")
+    p_reclassify.add_argument("--since", type=_date_arg, required=True)
+    p_reclassify.add_argument("--until", type=_date_arg, required=True)
+    p_reclassify.add_argument("--concurrency", type=int, default=4)
+    p_reclassify.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+
+    p_bench = sub.add_parser("bench-startup", help="Report import time and time to first response")
+    p_bench.add_argument("--top", type=int, default=10, help="Number of heaviest packages to list")
+    p_bench.add_argument("--timeout", type=float, default=60)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "bench-startup":
+        bench_startup(args.top, args.timeout)
+        return
+
+    async def run():
+        try:
+            if args.command == "backfill":
+                await backfill(args.paths, args.classify, args.concurrency, args.pending)
+            elif not await reclassify(args.since, args.until, args.concurrency, args.restart):
+                sys.exit(1)
+        finally:
+            await close_db()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ class Settings(BaseSettings):
     database_path: str = "data/twit-muncher.db"
     session_secret: str = "change-me-to-a-random-string"
     allowed_emails: str = ""
+    admin_emails: str = ""
+    loop_lag_threshold_ms: int = 250
+    slow_query_threshold_ms: int = 100
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "extra": "ignore"}
 
@@ -1,11 +1,14 @@
 import json
 import os
+import zlib
 
 import aiosqlite
 
 from app.config import settings
 
 _db: aiosqlite.Connection | None = None
+# Called with each new connection before it's used, e.g. to add instrumentation
+_connection_hooks: list = []
 
 DEFAULT_CATEGORIES = [
     {
@@ -89,34 +92,19 @@ DEFAULT_SETTINGS = {
     "briefing_times": ["09:00", "16:00"],
     "briefing_days": ["mon", "tue", "wed", "thu", "fri"],
     "poll_interval_minutes": 12,
+    "poll_min_interval_minutes": 2,
+    "poll_max_interval_minutes": 30,
     "categories": DEFAULT_CATEGORIES,
     "classification_prompt": generate_classification_prompt(DEFAULT_CATEGORIES),
     "gemini_model": "gemini-2.5-flash",
+    "local_classifier_enabled": True,
+    "local_classifier_threshold": 0.95,
+    "local_classifier_min_samples": 500,
+    "local_classifier_audit_rate": 0.05,
 }
 
 
-async def get_db() -> aiosqlite.Connection:
-    global _db
-    if _db is None:
-        os.makedirs(os.path.dirname(settings.database_path) or ".", exist_ok=True)
-        _db = await aiosqlite.connect(settings.database_path)
-        _db.row_factory = aiosqlite.Row
-        await _db.execute("PRAGMA journal_mode=WAL")
-        await _db.execute("PRAGMA foreign_keys=ON")
-        await _create_tables(_db)
-        await _seed_settings(_db)
-    return _db
-
-
-async def close_db():
-    global _db
-    if _db is not None:
-        await _db.close()
-        _db = None
-
-
-async def _create_tables(db: aiosqlite.Connection):
-    await db.executescript("""
+SCHEMA = """
         CREATE TABLE IF NOT EXISTS tweets (
             id TEXT PRIMARY KEY,
             author TEXT NOT NULL,
@@ -147,18 +135,74 @@ async def _create_tables(db: aiosqlite.Connection):
             value TEXT NOT NULL
         );
 
+        CREATE TABLE IF NOT EXISTS category_summaries (
+            category TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            tweet_ids TEXT NOT NULL DEFAULT '[]',
+            updated_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS corrections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tweet_id TEXT NOT NULL,
+            old_category TEXT,
+            new_category TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
         CREATE INDEX IF NOT EXISTS idx_tweets_category ON tweets(category);
         CREATE INDEX IF NOT EXISTS idx_tweets_briefing_id ON tweets(briefing_id);
         CREATE INDEX IF NOT EXISTS idx_tweets_published_at ON tweets(published_at);
-    """)
+    """
+
+# Changes whenever the schema or the set of default settings does
+SCHEMA_VERSION = zlib.crc32(
+    (SCHEMA + json.dumps(sorted(DEFAULT_SETTINGS))).encode()
+) & 0x7FFFFFFF
 
 
-async def _seed_settings(db: aiosqlite.Connection):
-    for key, value in DEFAULT_SETTINGS.items():
-        await db.execute(
-            "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
-            (key, json.dumps(value)),
-        )
+def add_connection_hook(hook):
+    if hook not in _connection_hooks:
+        _connection_hooks.append(hook)
+
+
+async def get_db() -> aiosqlite.Connection:
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(settings.database_path) or ".", exist_ok=True)
+        _db = await aiosqlite.connect(settings.database_path)
+        _db.row_factory = aiosqlite.Row
+        for hook in _connection_hooks:
+            hook(_db)
+        await _db.execute("PRAGMA journal_mode=WAL")
+        await _db.execute("PRAGMA foreign_keys=ON")
+        await _ensure_schema(_db)
+    return _db
+
+
+async def close_db():
+    global _db
+    if _db is not None:
+        await _db.close()
+        _db = None
+
+
+async def _ensure_schema(db: aiosqlite.Connection):
+    """Create tables and seed default settings, skipping both if already done.
+
+    The schema fingerprint is stored in PRAGMA user_version, so a normal
+    restart costs one PRAGMA read instead of a DDL script and a round of inserts.
+    """
+    row = await db.execute_fetchall("PRAGMA user_version")
+    if row[0][0] == SCHEMA_VERSION:
+        return
+
+    await db.executescript(f"BEGIN;\n{SCHEMA}\nCOMMIT;")
+    await db.executemany(
+        "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+        [(key, json.dumps(value)) for key, value in DEFAULT_SETTINGS.items()],
+    )
+    await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     await db.commit()
 
 
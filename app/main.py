@@ -1,10 +1,8 @@
 import asyncio
 from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
@@ -14,17 +12,70 @@ from starlette.middleware.sessions import SessionMiddleware
 from app.config import settings
 from app.auth import configure_oauth, get_allowed_emails, oauth
 from app.middleware import AuthMiddleware, SecurityHeadersMiddleware
-from app.database import close_db, get_all_settings, get_db
-from app.services.rss_poller import poll_and_classify
+from app.database import add_connection_hook, close_db, get_all_settings, get_db
+from app.services.rss_poller import poll_list
 from app.services.briefing import generate_briefing
+from app.services import diagnostics, poll_scheduler
 
 configure_oauth()
 
-scheduler = AsyncIOScheduler()
+_scheduler = None
 
 
-async def scheduled_poll():
-    await poll_and_classify()
+def get_scheduler():
+    # APScheduler is imported on first use so importing app.main (e.g. from the CLI)
+    # doesn't pay for it. The lifespan still starts it before the first request.
+    global _scheduler
+    if _scheduler is None:
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        _scheduler = AsyncIOScheduler()
+    return _scheduler
+
+
+async def scheduled_poll(list_id: str):
+    try:
+        await poll_list(list_id)
+    finally:
+        await schedule_list_poll(list_id)
+
+
+async def schedule_list_poll(list_id: str, settings: dict | None = None):
+    """Schedule the next poll of a list based on its observed activity."""
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    if settings is None:
+        settings = await get_all_settings()
+    if list_id not in (settings.get("twitter_list_ids") or []):
+        return
+
+    interval = poll_scheduler.next_interval(list_id, settings)
+    run_at = datetime.now(timezone.utc) + timedelta(minutes=poll_scheduler.with_jitter(interval))
+    poll_scheduler.mark_scheduled(list_id, run_at)
+
+    scheduler = get_scheduler()
+    job = scheduler.get_job(f"poll_{list_id}")
+    if job is not None:
+        job.modify(next_run_time=run_at)
+        return
+
+    # One persistent job per list, moved forward after every run. The interval
+    # trigger is only a fallback so a run that never reschedules isn't the last,
+    # and late runs are coalesced rather than dropped as misfires.
+    max_interval = max(
+        settings.get("poll_max_interval_minutes", 30),
+        settings.get("poll_min_interval_minutes", 2),
+    )
+    scheduler.add_job(
+        scheduled_poll,
+        IntervalTrigger(minutes=max_interval),
+        args=[list_id],
+        id=f"poll_{list_id}",
+        next_run_time=run_at,
+        misfire_grace_time=None,
+        coalesce=True,
+        max_instances=1,
+    )
 
 
 async def scheduled_briefing():
@@ -32,8 +83,11 @@ async def scheduled_briefing():
 
 
 async def reschedule_jobs():
+    from apscheduler.triggers.cron import CronTrigger
+
+    scheduler = get_scheduler()
     settings = await get_all_settings()
-    poll_interval = settings.get("poll_interval_minutes", 12)
+    list_ids = settings.get("twitter_list_ids") or []
     briefing_times = settings.get("briefing_times", ["09:00", "16:00"])
     briefing_days = settings.get("briefing_days", ["mon", "tue", "wed", "thu", "fri"])
 
@@ -41,13 +95,10 @@ async def reschedule_jobs():
     for job in scheduler.get_jobs():
         job.remove()
 
-    # Schedule polling
-    scheduler.add_job(
-        scheduled_poll,
-        IntervalTrigger(minutes=poll_interval),
-        id="poll",
-        replace_existing=True,
-    )
+    # Schedule polling, one persistent job per list
+    poll_scheduler.forget_lists(list_ids)
+    for list_id in list_ids:
+        await schedule_list_poll(list_id, settings)
 
     # Schedule briefings
     day_map = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
@@ -72,11 +123,14 @@ async def reschedule_jobs():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    diagnostics.start_lag_monitor()
+    add_connection_hook(diagnostics.instrument_connection)
     await get_db()
     await reschedule_jobs()
-    scheduler.start()
+    get_scheduler().start()
     yield
-    scheduler.shutdown()
+    get_scheduler().shutdown()
+    diagnostics.stop_lag_monitor()
     await close_db()
 
 
@@ -91,11 +145,13 @@ app.add_middleware(SessionMiddleware, secret_key=settings.session_secret)
 
 templates = Jinja2Templates(directory="app/templates")
 
-from app.routers import briefings, settings as settings_router, api
+from app.routers import briefings, settings as settings_router, api, export, diagnostics as diagnostics_router
 
 app.include_router(briefings.router)
 app.include_router(settings_router.router)
 app.include_router(api.router)
+app.include_router(export.router)
+app.include_router(diagnostics_router.router)
 
 
 @app.get("/")
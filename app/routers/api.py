@@ -1,19 +1,75 @@
+import asyncio
 import json
+import logging
 
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.database import get_all_settings, get_db, get_setting, set_setting, generate_classification_prompt
+from app.services import events, triage
 from app.services.briefing import generate_briefing
 from app.services.rss_poller import poll_and_classify
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api")
 
+# Seconds between keep-alive comments on an idle event stream
+EVENT_HEARTBEAT = 15
+# Most reclassifications accepted in one batch request
+MAX_BATCH_CHANGES = 5000
+# Most author selectors per batch; each can touch every tweet that author has posted
+MAX_BATCH_AUTHORS = 20
+# Most corrections returned per page
+MAX_CORRECTIONS_PAGE = 5000
+
+_poll_task: asyncio.Task | None = None
+
+
+def _log_poll_failure(task: asyncio.Task):
+    # Nothing awaits the background poll, so its exception would otherwise go unseen
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Manual poll failed", exc_info=task.exception())
+
 
 @router.post("/poll-now")
 async def poll_now():
-    await poll_and_classify()
-    return {"status": "ok", "message": "Poll and classification complete"}
+    global _poll_task
+    # Progress is reported over /api/events, so don't hold the request open
+    if _poll_task is not None and not _poll_task.done():
+        return {"status": "running", "message": "A poll is already in progress"}
+    _poll_task = asyncio.create_task(poll_and_classify())
+    _poll_task.add_done_callback(_log_poll_failure)
+    return {"status": "started", "message": "Poll started"}
+
+
+@router.get("/events")
+async def stream_events(request: Request):
+    last_event_id = request.headers.get("last-event-id", "")
+    sub = events.subscribe(int(last_event_id) if last_event_id.isdigit() else None)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not sub.dropped:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event_id, event, data = await asyncio.wait_for(
+                        sub.queue.get(), EVENT_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+        finally:
+            events.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/generate-briefing")
@@ -56,15 +112,48 @@ async def get_briefing_tweets(briefing_id: int, category: str | None = None):
 
 @router.post("/reclassify/{tweet_id}")
 async def reclassify_tweet(tweet_id: str, category: str):
-    db = await get_db()
-    await db.execute(
-        "UPDATE tweets SET category = ?, category_reason = 'Manual override', confidence = 1.0 WHERE id = ?",
-        (category, tweet_id),
-    )
-    await db.commit()
+    await triage.reclassify([{"tweet_id": tweet_id, "category": category}])
     return {"status": "ok"}
 
 
+@router.post("/reclassify")
+async def reclassify_batch(body: dict):
+    """Apply many reclassifications in one transaction, in the order given.
+
+    Body: {"operations": [{"tweet_id": ..., "category": ...}
+                          | {"author": ..., "category": ..., "briefing_id": optional}, ...]}
+    """
+    categories = {c["key"] for c in await get_setting("categories") or []}
+    operations = body.get("operations") or []
+
+    if len(operations) > MAX_BATCH_CHANGES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_CHANGES} changes per request")
+    if sum(1 for op in operations if not op.get("tweet_id")) > MAX_BATCH_AUTHORS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_AUTHORS} author selectors per request")
+    for op in operations:
+        if op.get("category") not in categories:
+            raise HTTPException(status_code=400, detail=f"Unknown category: {op.get('category')}")
+        if not op.get("tweet_id") and not op.get("author"):
+            raise HTTPException(status_code=400, detail="Each operation needs a tweet_id or an author")
+
+    updated = await triage.reclassify(operations)
+    return {"status": "ok", "updated": updated}
+
+
+@router.get("/corrections")
+async def list_corrections(after: int = 0, limit: int = 500):
+    corrections = await triage.get_corrections(after, min(max(limit, 1), MAX_CORRECTIONS_PAGE))
+    next_after = corrections[-1]["id"] if corrections else after
+    return {"corrections": corrections, "next": next_after}
+
+
+@router.get("/local-classifier")
+async def local_classifier_stats():
+    from app.services import local_classifier
+
+    return local_classifier.get_stats()
+
+
 @router.get("/settings")
 async def get_settings():
     return await get_all_settings()
@@ -76,7 +165,14 @@ async def update_settings(body: dict):
         await set_setting(key, value)
 
     # Reschedule jobs if timing changed
-    if any(k in body for k in ("poll_interval_minutes", "briefing_times", "briefing_days")):
+    if any(k in body for k in (
+        "twitter_list_ids",
+        "poll_interval_minutes",
+        "poll_min_interval_minutes",
+        "poll_max_interval_minutes",
+        "briefing_times",
+        "briefing_days",
+    )):
         from app.main import reschedule_jobs
         await reschedule_jobs()
 
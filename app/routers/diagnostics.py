@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+
+from app.config import settings
+from app.services import diagnostics
+
+
+def require_admin(request: Request):
+    admins = {e.strip().lower() for e in settings.admin_emails.split(",") if e.strip()}
+    if request.session.get("user") not in admins:
+        raise HTTPException(status_code=403, detail="Admins only")
+
+
+router = APIRouter(prefix="/api/diagnostics", dependencies=[Depends(require_admin)])
+
+
+@router.get("")
+async def get_diagnostics():
+    return diagnostics.report()
+
+
+@router.post("/profile")
+async def arm_profile(target: str, mode: str = "cprofile"):
+    if target not in diagnostics.PROFILE_TARGETS:
+        raise HTTPException(status_code=400, detail=f"target must be one of {', '.join(diagnostics.PROFILE_TARGETS)}")
+    if mode not in diagnostics.PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(diagnostics.PROFILE_MODES)}")
+    diagnostics.arm_profile(target, mode)
+    return {"status": "ok", "message": f"The next {target} run will be profiled with {mode}"}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: int):
+    profile = diagnostics.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        profile["data"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile["id"]}-{profile["filename"]}"'},
+    )
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.database import get_db
+
+router = APIRouter(prefix="/api/export")
+
+# Rows per query. Each page is its own short read so the poller is never held up.
+PAGE_SIZE = 1000
+
+TWEET_COLUMNS = [
+    "id", "author", "content", "content_text", "media_urls", "tweet_url",
+    "published_at", "fetched_at", "category", "category_reason", "confidence", "briefing_id",
+]
+BRIEFING_COLUMNS = [
+    "id", "generated_at", "period_start", "period_end", "tweet_count", "summary",
+]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _iso(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+async def _rows(table: str, columns: list[str], where: list[str], params: list):
+    """Yield rows in rowid order, one page per query (keyset pagination)."""
+    db = await get_db()
+    clauses = " AND ".join(where + ["rowid > ?"])
+    last_rowid = 0
+    while True:
+        rows = await db.execute_fetchall(
+            f"""SELECT rowid, {", ".join(columns)} FROM {table}
+                WHERE {clauses} ORDER BY rowid LIMIT ?""",
+            [*params, last_rowid, PAGE_SIZE],
+        )
+        if not rows:
+            return
+        last_rowid = rows[-1][0]
+        yield [dict(row) for row in rows]
+
+
+async def _encode(pages, columns: list[str], fmt: str):
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+        async for page in pages:
+            for row in page:
+                writer.writerow([row[c] for c in columns])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()
+        return
+
+    async for page in pages:
+        lines = []
+        for row in page:
+            record = {c: row[c] for c in columns}
+            if "media_urls" in record:
+                try:
+                    record["media_urls"] = json.loads(record["media_urls"] or "[]")
+                except (json.JSONDecodeError, TypeError):
+                    record["media_urls"] = []
+            lines.append(json.dumps(record) + "\n")
+        yield "".join(lines)
+
+
+async def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _response(request: Request, chunks, filename: str, fmt: str) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        chunks = _gzip(chunks)
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+def _check_format(fmt: str):
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(MEDIA_TYPES)}")
+
+
+@router.get("/tweets")
+async def export_tweets(
+    request: Request,
+    format: str = "ndjson",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    category: str | None = None,
+    author: str | None = None,
+    briefing_id: int | None = None,
+):
+    _check_format(format)
+    where, params = [], []
+    if since:
+        where.append("published_at >= ?")
+        params.append(_iso(since))
+    if until:
+        where.append("published_at < ?")
+        params.append(_iso(until))
+    if category:
+        where.append("category = ?")
+        params.append(category)
+    if author:
+        where.append("LOWER(author) = ?")
+        params.append(author.lower().lstrip("@"))
+    if briefing_id is not None:
+        where.append("briefing_id = ?")
+        params.append(briefing_id)
+
+    pages = _rows("tweets", TWEET_COLUMNS, where, params)
+    return _response(request, _encode(pages, TWEET_COLUMNS, format), "tweets", format)
+
+
+@router.get("/briefings")
+async def export_briefings(
+    request: Request,
+    format: str = "ndjson",
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    _check_format(format)
+    where, params = [], []
+    if since:
+        where.append("generated_at >= ?")
+        params.append(_iso(since))
+    if until:
+        where.append("generated_at < ?")
+        params.append(_iso(until))
+
+    pages = _rows("briefings", BRIEFING_COLUMNS, where, params)
+    return _response(request, _encode(pages, BRIEFING_COLUMNS, format), "briefings", format)
@@ -3,6 +3,7 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
 from app.database import get_all_settings
+from app.services.poll_scheduler import snapshot
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -10,7 +11,17 @@ templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/settings", response_class=HTMLResponse)
 async def settings_page(request: Request):
+    # Imported here so NumPy isn't loaded at startup
+    from app.services import local_classifier
+
     all_settings = await get_all_settings()
+    poll_schedule = snapshot(all_settings.get("twitter_list_ids") or [])
     return templates.TemplateResponse(
-        "settings.html", {"request": request, "settings": all_settings}
+        "settings.html",
+        {
+            "request": request,
+            "settings": all_settings,
+            "poll_schedule": poll_schedule,
+            "local_classifier": local_classifier.get_stats(),
+        },
     )
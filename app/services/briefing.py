@@ -1,25 +1,39 @@
+import json
 import logging
 from datetime import datetime, timezone
 
 from app.database import get_db
+from app.services import events
+from app.services.diagnostics import profile_target
+from app.services.summarizer import build_briefing_summary
 
 logger = logging.getLogger(__name__)
 
 
+@profile_target("briefing")
 async def generate_briefing() -> int | None:
     db = await get_db()
 
-    # Find tweets not yet assigned to a briefing and already classified
+    pending = (await db.execute_fetchall(
+        "SELECT COUNT(*) FROM tweets WHERE briefing_id IS NULL AND category IS NOT NULL"
+    ))[0][0]
+
+    if not pending:
+        logger.info("No unassigned tweets for briefing")
+        return None
+
+    # Category summaries are kept up to date between briefings, so this is just a merge
+    events.publish("briefing", {"stage": "summarizing", "tweets": pending})
+    summary = await build_briefing_summary()
+
+    # Find tweets not yet assigned to a briefing and already classified. This is
+    # read after the summary is built so every tweet it covers is filed here.
     rows = await db.execute_fetchall(
         """SELECT id FROM tweets
            WHERE briefing_id IS NULL AND category IS NOT NULL
            ORDER BY published_at ASC"""
     )
 
-    if not rows:
-        logger.info("No unassigned tweets for briefing")
-        return None
-
     tweet_ids = [row[0] for row in rows]
     now = datetime.now(timezone.utc).isoformat()
 
@@ -38,7 +52,7 @@ async def generate_briefing() -> int | None:
     cursor = await db.execute(
         """INSERT INTO briefings (generated_at, period_start, period_end, tweet_count, summary)
            VALUES (?, ?, ?, ?, ?)""",
-        (now, period_start, period_end, len(tweet_ids), ""),
+        (now, period_start, period_end, len(tweet_ids), summary),
     )
     briefing_id = cursor.lastrowid
 
@@ -48,7 +62,19 @@ async def generate_briefing() -> int | None:
         f"UPDATE tweets SET briefing_id = ? WHERE id IN ({placeholders})",
         [briefing_id] + tweet_ids,
     )
+    # Drop the rolling summaries this briefing used up; any built since the
+    # snapshot above only from newer tweets are kept for the next briefing
+    filed = set(tweet_ids)
+    used = [
+        (row["category"],)
+        for row in await db.execute_fetchall("SELECT category, tweet_ids FROM category_summaries")
+        if filed & set(json.loads(row["tweet_ids"]))
+    ]
+    await db.executemany("DELETE FROM category_summaries WHERE category = ?", used)
     await db.commit()
 
+    events.publish("briefing", {
+        "stage": "generated", "briefing_id": briefing_id, "tweets": len(tweet_ids),
+    })
     logger.info(f"Generated briefing #{briefing_id} with {len(tweet_ids)} tweets")
     return briefing_id
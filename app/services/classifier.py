@@ -1,42 +1,125 @@
+import asyncio
 import json
 import logging
 
-from google import genai
-
 from app.config import settings
-from app.database import get_db, get_setting
+from app.database import get_all_settings, get_db
+from app.services import events
+from app.services.gemini import generate_config, get_client
 
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 25
 
 
-async def classify_tweets(tweets: list[dict]):
+async def classify_tweets(
+    tweets: list[dict],
+    concurrency: int = 1,
+    overwrite: bool = False,
+) -> list[str]:
+    """Classify tweets, running up to `concurrency` Gemini batches at once.
+
+    With overwrite, existing labels are replaced (except manual and must-read ones) and
+    the local pre-classifier is bypassed, so every tweet gets a fresh LLM label.
+    Returns the ids of tweets that couldn't be sent to Gemini or whose batch failed.
+    """
     if not tweets:
-        return
+        return []
+
+    # Pulls in NumPy, so it's only imported once there's something to classify
+    from app.services import local_classifier
+
+    app_settings = await get_all_settings()
+
+    predictions = {}
+    if not overwrite:
+        # Let the local model settle the obvious cases before paying for the LLM
+        await local_classifier.ensure_trained()
+        confident, tweets, predictions = local_classifier.split_confident(tweets, app_settings)
+        if confident:
+            await _store_local_labels(confident)
+            _publish_classified(confident)
+
+    if not tweets:
+        return []
 
     if not settings.gemini_api_key:
         logger.warning("No GEMINI_API_KEY set, skipping classification")
-        return
+        return [t["id"] for t in tweets]
+
+    prompt = app_settings.get("classification_prompt")
+    model = app_settings.get("gemini_model") or "gemini-2.5-flash"
 
-    prompt = await get_setting("classification_prompt")
-    model = await get_setting("gemini_model") or "gemini-2.5-flash"
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    total_batches = (len(tweets) + BATCH_SIZE - 1) // BATCH_SIZE
+    done_batches = 0
+    failed: list[str] = []
+    events.publish("classify", {"stage": "started", "tweets": len(tweets), "batches": total_batches})
 
-    client = genai.Client(api_key=settings.gemini_api_key)
+    async def run_batch(batch: list[dict]):
+        nonlocal done_batches
+        async with semaphore:
+            try:
+                labels = await _classify_batch(model, prompt, batch, overwrite)
+            except Exception as e:
+                logger.error(f"Classification failed: {e}")
+                failed.extend(t["id"] for t in batch)
+                labels = {}
+        classified = [{**t, "category": labels[t["id"]]} for t in batch if t["id"] in labels]
+        local_classifier.record_agreement(predictions, labels)
+        local_classifier.learn(classified)
+        done_batches += 1
+        events.publish("classify", {"stage": "batch", "done": done_batches, "batches": total_batches})
+        _publish_classified(classified)
 
     # Process in batches
-    for i in range(0, len(tweets), BATCH_SIZE):
-        batch = tweets[i : i + BATCH_SIZE]
-        await _classify_batch(client, model, prompt, batch)
+    await asyncio.gather(*(
+        run_batch(tweets[i : i + BATCH_SIZE])
+        for i in range(0, len(tweets), BATCH_SIZE)
+    ))
+    return failed
+
+
+def _publish_classified(tweets: list[dict]):
+    events.publish("tweets", {"tweets": [
+        {
+            "id": t["id"],
+            "author": t.get("author", ""),
+            "content_text": t.get("content_text", ""),
+            "category": t["category"],
+        }
+        for t in tweets
+    ]})
+
+
+async def _store_local_labels(tweets: list[dict]):
+    from app.services import local_classifier
+
+    db = await get_db()
+    await db.executemany(
+        """UPDATE tweets SET category = ?, confidence = ?,
+           category_reason = ? WHERE id = ? AND category IS NULL""",
+        [
+            (t["category"], t["confidence"], local_classifier.LOCAL_REASON, t["id"])
+            for t in tweets
+        ],
+    )
+    await db.commit()
+    logger.info(f"Classified {len(tweets)} tweets locally")
 
 
 async def _classify_batch(
-    client: genai.Client,
     model: str,
     system_prompt: str,
     tweets: list[dict],
-):
+    overwrite: bool = False,
+) -> dict[str, str]:
+    """Classify a batch with Gemini and return the applied labels by tweet id.
+
+    Raises if the request fails or the response can't be parsed.
+    """
     db = await get_db()
+    labels = {}
 
     # Build user message with tweets
     tweet_items = []
@@ -58,38 +141,47 @@ async def _classify_batch(
 
     user_msg = json.dumps(tweet_items, indent=2)
 
-    try:
-        response = client.models.generate_content(
-            model=model,
-            contents=user_msg,
-            config=genai.types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                temperature=0.1,
-                response_mime_type="application/json",
-            ),
-        )
-
-        text = response.text.strip()
-        results = json.loads(text)
-
-        if isinstance(results, dict) and "classifications" in results:
-            results = results["classifications"]
-
-        for item in results:
-            tweet_id = item.get("id")
-            category = item.get("category")
-            confidence = item.get("confidence", 0.5)
-            reason = item.get("reason", "")
-
-            if tweet_id and category:
-                await db.execute(
+    response = await get_client().aio.models.generate_content(
+        model=model,
+        contents=user_msg,
+        config=generate_config(
+            system_instruction=system_prompt,
+            temperature=0.1,
+            response_mime_type="application/json",
+        ),
+    )
+
+    text = response.text.strip()
+    results = json.loads(text)
+
+    if isinstance(results, dict) and "classifications" in results:
+        results = results["classifications"]
+
+    for item in results:
+        tweet_id = item.get("id")
+        category = item.get("category")
+        confidence = item.get("confidence", 0.5)
+        reason = item.get("reason", "")
+
+        if tweet_id and category:
+            if overwrite:
+                cursor = await db.execute(
+                    """UPDATE tweets SET category = ?, confidence = ?,
+                       category_reason = ? WHERE id = ?
+                       AND (category_reason IS NULL
+                            OR category_reason NOT IN ('Manual override', 'Must-read account'))""",
+                    (category, confidence, reason, tweet_id),
+                )
+            else:
+                cursor = await db.execute(
                     """UPDATE tweets SET category = ?, confidence = ?,
                        category_reason = ? WHERE id = ? AND category IS NULL""",
                     (category, confidence, reason, tweet_id),
                 )
+            if cursor.rowcount:
+                labels[tweet_id] = category
 
-        await db.commit()
-        logger.info(f"Classified batch of {len(tweets)} tweets")
+    await db.commit()
+    logger.info(f"Classified batch of {len(tweets)} tweets")
 
-    except Exception as e:
-        logger.error(f"Classification failed: {e}")
+    return labels
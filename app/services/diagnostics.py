@@ -0,0 +1,263 @@
+import asyncio
+import cProfile
+import functools
+import itertools
+import logging
+import marshal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often the event loop reports in; the watchdog checks at the same rate
+HEARTBEAT_INTERVAL = 0.1
+# Interval between stack samples in "sample" profiling mode
+SAMPLE_INTERVAL = 0.005
+# Entries kept in each in-memory log
+LOG_SIZE = 100
+PROFILES_KEPT = 5
+
+# Functions aiosqlite runs on its worker thread that execute SQL given as the first argument
+TIMED_CALLS = ("execute", "executemany", "executescript", "_execute_fetchall")
+
+PROFILE_TARGETS = ("poll", "briefing")
+PROFILE_MODES = ("cprofile", "sample")
+
+lag_events: deque[dict] = deque(maxlen=LOG_SIZE)
+slow_queries: deque[dict] = deque(maxlen=LOG_SIZE)
+profiles: deque[dict] = deque(maxlen=PROFILES_KEPT)
+
+_profile_ids = itertools.count(1)
+_armed: dict[str, str] = {}  # target -> mode
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class LagMonitor:
+    """Detects event-loop stalls and records the stack that was running.
+
+    A coroutine on the loop updates a heartbeat; a watchdog thread notices when
+    it stops and grabs the loop thread's current frame while the stall is live.
+    """
+
+    def __init__(self, threshold_ms: int):
+        self.threshold = threshold_ms / 1000
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        threading.Thread(target=self._watch, name="lag-monitor", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _beat(self):
+        while True:
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _watch(self):
+        current = None
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            lag = time.monotonic() - self._heartbeat - HEARTBEAT_INTERVAL
+            if lag < self.threshold:
+                if current is not None:
+                    logger.warning(f"Event loop stalled for {current['lag_ms']} ms")
+                    current = None
+                continue
+            if current is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                current = {
+                    "at": _now(),
+                    "lag_ms": 0,
+                    "stack": "".join(traceback.format_stack(frame)) if frame else "",
+                }
+                lag_events.append(current)
+            current["lag_ms"] = round(lag * 1000)
+
+
+_monitor: LagMonitor | None = None
+
+
+def start_lag_monitor():
+    global _monitor
+    if _monitor is None:
+        _monitor = LagMonitor(settings.loop_lag_threshold_ms)
+        _monitor.start()
+
+
+def stop_lag_monitor():
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
+
+
+def instrument_connection(db):
+    """Log queries on an aiosqlite connection that take longer than the threshold.
+
+    Statements are timed on aiosqlite's worker thread, so `ms` is the time
+    SQLite spent running them; `queue_ms` is how long they first waited behind
+    other work on the shared connection, which doesn't count towards the threshold.
+    """
+    # These are aiosqlite internals, so check they're still there rather than
+    # letting an upgrade silently turn the slow-query log off
+    missing = [name for name in ("_execute", "_execute_fetchall") if not callable(getattr(db, name, None))]
+    if missing:
+        raise RuntimeError(
+            f"aiosqlite.Connection has no {', '.join(missing)}; "
+            "instrument_connection needs updating for this aiosqlite version"
+        )
+
+    threshold = settings.slow_query_threshold_ms / 1000
+    queue = db._execute
+
+    @functools.wraps(queue)
+    async def _execute(fn, *args, **kwargs):
+        name = getattr(fn, "__name__", "")
+        if name not in TIMED_CALLS or not args:
+            return await queue(fn, *args, **kwargs)
+        queued = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if elapsed >= threshold:
+                    slow_queries.append({
+                        "at": _now(),
+                        "ms": round(elapsed * 1000, 1),
+                        "queue_ms": round((started - queued) * 1000, 1),
+                        "method": name.lstrip("_"),
+                        "sql": " ".join(args[0].split())[:500],
+                    })
+
+        return await queue(timed)
+
+    # Every Connection and Cursor call goes through _execute to reach the worker thread
+    db._execute = _execute
+
+
+def arm_profile(target: str, mode: str):
+    _armed[target] = mode
+
+
+def armed() -> dict[str, str]:
+    return dict(_armed)
+
+
+class _Sampler:
+    """Collects collapsed stacks of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> bytes:
+        self._stop.set()
+        self._thread.join()
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return ("\n".join(lines) + "\n").encode()
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+
+def profile_target(target: str):
+    """Profile the next call of the decorated coroutine function once armed.
+
+    When nothing is armed the only cost is a dict lookup per call. Both modes
+    see everything running on the event loop during the call, not just it.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            mode = _armed.pop(target, None)
+            if mode is None:
+                return await func(*args, **kwargs)
+
+            started_at = _now()
+            started = time.perf_counter()
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                profiler = _Sampler(threading.get_ident())
+                profiler.start()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if mode == "cprofile":
+                    profiler.disable()
+                    profiler.create_stats()
+                    # Same format as Profile.dump_stats, loadable with pstats.Stats
+                    data = marshal.dumps(profiler.stats)
+                    filename = f"{target}.pstats"
+                else:
+                    data = profiler.stop()
+                    filename = f"{target}.collapsed.txt"
+                profile_id = next(_profile_ids)
+                profiles.append({
+                    "id": profile_id,
+                    "target": target,
+                    "mode": mode,
+                    "function": func.__name__,
+                    "started_at": started_at,
+                    "duration_ms": round((time.perf_counter() - started) * 1000),
+                    "filename": filename,
+                    "data": data,
+                })
+                logger.info(f"Captured {mode} profile #{profile_id} of {func.__name__}")
+        return wrapper
+    return decorator
+
+
+def get_profile(profile_id: int) -> dict | None:
+    for profile in profiles:
+        if profile["id"] == profile_id:
+            return profile
+    return None
+
+
+def report() -> dict:
+    return {
+        "loop_lag_threshold_ms": settings.loop_lag_threshold_ms,
+        "slow_query_threshold_ms": settings.slow_query_threshold_ms,
+        "lag_events": list(lag_events),
+        "slow_queries": list(slow_queries),
+        "armed": armed(),
+        "profiles": [
+            {k: v for k, v in p.items() if k != "data"} | {"size": len(p["data"])}
+            for p in profiles
+        ],
+    }
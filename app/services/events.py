@@ -0,0 +1,62 @@
+import asyncio
+import itertools
+import json
+from collections import deque
+
+# Events a single client may fall behind by before it is dropped
+QUEUE_SIZE = 1000
+# Events kept for clients reconnecting with Last-Event-ID. Larger than QUEUE_SIZE, so a
+# client dropped for falling behind can still catch up, with room for events published
+# while it reconnects.
+REPLAY_SIZE = QUEUE_SIZE * 2
+
+_ids = itertools.count(1)
+_buffer: deque[tuple[int, str, str]] = deque(maxlen=REPLAY_SIZE)
+_subscribers: set["Subscription"] = set()
+
+
+class Subscription:
+    def __init__(self, backlog: list[tuple[int, str, str]] | None = None):
+        backlog = backlog or []
+        # Room for the replayed backlog on top of the usual allowance
+        self.queue: asyncio.Queue[tuple[int, str, str]] = asyncio.Queue(
+            maxsize=QUEUE_SIZE + len(backlog)
+        )
+        for item in backlog:
+            self.queue.put_nowait(item)
+        self.dropped = False
+
+
+def publish(event: str, data: dict):
+    """Send an event to every connected client. Safe to call with no subscribers."""
+    item = (next(_ids), event, json.dumps(data))
+    _buffer.append(item)
+    for sub in list(_subscribers):
+        try:
+            sub.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too slow to keep up; it can reconnect and replay from the buffer
+            sub.dropped = True
+            _subscribers.discard(sub)
+
+
+def subscribe(last_event_id: int | None = None) -> Subscription:
+    """Subscribe to new events, first replaying any after last_event_id.
+
+    If some of those events have already left the buffer, or the id predates a
+    restart, a "reset" event is sent instead so the client knows it missed some.
+    """
+    backlog = []
+    if last_event_id is not None:
+        latest = _buffer[-1][0] if _buffer else 0
+        if last_event_id > latest or (_buffer and last_event_id < _buffer[0][0] - 1):
+            backlog = [(latest, "reset", json.dumps({"last_event_id": last_event_id}))]
+        else:
+            backlog = [item for item in _buffer if item[0] > last_event_id]
+    sub = Subscription(backlog)
+    _subscribers.add(sub)
+    return sub
+
+
+def unsubscribe(sub: Subscription):
+    _subscribers.discard(sub)
@@ -0,0 +1,25 @@
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# The google-genai SDK is slow to import, so it's only loaded on first use
+_client = None
+
+
+def get_client():
+    """Return the process-wide Gemini client."""
+    global _client
+    if _client is None:
+        from google import genai
+
+        _client = genai.Client(api_key=settings.gemini_api_key)
+        logger.info("Created Gemini client")
+    return _client
+
+
+def generate_config(**kwargs):
+    from google.genai import types
+
+    return types.GenerateContentConfig(**kwargs)
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import zlib
+
+import numpy as np
+
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+LOCAL_REASON = "Local model"
+# Labels that say nothing about a tweet's content, so they are never trained on
+UNTRAINABLE_REASONS = ("Must-read account", LOCAL_REASON)
+
+N_FEATURES = 2 ** 18
+ALPHA = 0.1  # Additive smoothing for the naive Bayes likelihoods
+
+_TOKEN_RE = re.compile(r"[a-z0-9$#@']+")
+
+
+def _features(author: str, text: str, has_media: bool) -> np.ndarray:
+    """Hash unigrams, bigrams, the author and a media flag into feature indices."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    grams.append(f"author:{(author or '').lower()}")
+    if has_media:
+        grams.append("has_media")
+    return np.fromiter(
+        (zlib.crc32(g.encode()) % N_FEATURES for g in grams),
+        dtype=np.int64,
+        count=len(grams),
+    )
+
+
+def _tweet_features(tweet: dict) -> np.ndarray:
+    media_urls = tweet.get("media_urls", "[]")
+    if isinstance(media_urls, str):
+        try:
+            media_urls = json.loads(media_urls)
+        except json.JSONDecodeError:
+            media_urls = []
+    return _features(tweet.get("author", ""), tweet.get("content_text", ""), bool(media_urls))
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over hashed n-grams, trainable one label at a time."""
+
+    def __init__(self):
+        self.classes: list[str] = []
+        self.class_counts = np.zeros(0, dtype=np.float64)
+        self.feature_counts = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self.labels: dict[str, str] = {}
+        self._log_probs: tuple[np.ndarray, np.ndarray] | None = None
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.labels)
+
+    def _class_index(self, category: str) -> int:
+        if category not in self.classes:
+            self.classes.append(category)
+            self.class_counts = np.append(self.class_counts, 0.0)
+            self.feature_counts = np.vstack(
+                [self.feature_counts, np.zeros((1, N_FEATURES), dtype=np.float32)]
+            )
+        return self.classes.index(category)
+
+    def _add(self, features: np.ndarray, category: str, weight: float):
+        idx = self._class_index(category)
+        self.class_counts[idx] += weight
+        np.add.at(self.feature_counts[idx], features, weight)
+        self._log_probs = None
+
+    def learn(self, tweet_id: str, features: np.ndarray, category: str):
+        """Train on a label, replacing whatever label this tweet had before."""
+        previous = self.labels.get(tweet_id)
+        if previous == category:
+            return
+        if previous is not None:
+            self._add(features, previous, -1.0)
+        self._add(features, category, 1.0)
+        self.labels[tweet_id] = category
+
+    def _compute_log_probs(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._log_probs is None:
+            counts = np.maximum(self.feature_counts, 0) + ALPHA
+            log_likelihood = np.log(counts) - np.log(counts.sum(axis=1, keepdims=True))
+            priors = np.maximum(self.class_counts, 0) + 1
+            log_prior = np.log(priors) - np.log(priors.sum())
+            self._log_probs = (log_prior, log_likelihood)
+        return self._log_probs
+
+    def predict(self, feature_lists: list[np.ndarray]) -> list[tuple[str, float]]:
+        """Return (category, probability) for each document."""
+        if not self.classes or not feature_lists:
+            return []
+        log_prior, log_likelihood = self._compute_log_probs()
+
+        lengths = np.array([len(f) for f in feature_lists])
+        flat = np.concatenate(feature_lists)
+        per_token = log_likelihood[:, flat]  # (classes, total tokens)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        # Every document has at least its author feature, so no segment is empty
+        scores = np.add.reduceat(per_token, starts, axis=1).T + log_prior
+
+        scores -= scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [(self.classes[b], float(probs[i, b])) for i, b in enumerate(best)]
+
+
+_model = NaiveBayesModel()
+_bootstrap_lock = asyncio.Lock()
+_bootstrapped = False
+
+_stats = {
+    "local_labelled": 0,
+    "sent_to_llm": 0,
+    "compared": 0,
+    "agreed": 0,
+    "audited": 0,
+    "audit_agreed": 0,
+    "by_category": {},
+}
+
+
+async def ensure_trained():
+    """Train on all labelled tweets in the database the first time it's needed."""
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    async with _bootstrap_lock:
+        if _bootstrapped:
+            return
+        db = await get_db()
+        rows = await db.execute_fetchall(
+            """SELECT id, author, content_text, media_urls, category FROM tweets
+               WHERE category IS NOT NULL
+               AND (category_reason IS NULL OR category_reason NOT IN (?, ?))""",
+            UNTRAINABLE_REASONS,
+        )
+        examples = [dict(row) for row in rows]
+        await asyncio.to_thread(_learn_all, examples)
+        _bootstrapped = True
+        logger.info(f"Local classifier trained on {len(examples)} labelled tweets")
+
+
+def _learn_all(tweets: list[dict]):
+    for t in tweets:
+        _model.learn(t["id"], _tweet_features(t), t["category"])
+
+
+def learn(tweets: list[dict]):
+    """Feed newly labelled tweets (LLM results or manual overrides) to the model."""
+    if _bootstrapped:
+        _learn_all(tweets)
+
+
+def split_confident(tweets: list[dict], settings: dict) -> tuple[list[dict], list[dict], dict]:
+    """Label the obvious cases locally.
+
+    Returns (confident, uncertain, predictions). Confident tweets carry their
+    predicted category and confidence; uncertain ones, plus a small audit sample
+    of confident ones, should go to the LLM. predictions maps every tweet id to
+    (local guess, whether it was confident) so the LLM's answers can be compared
+    afterwards, with the audit sample standing in for the tweets that skip it.
+    """
+    threshold = settings.get("local_classifier_threshold", 0.95)
+    min_samples = settings.get("local_classifier_min_samples", 500)
+    audit_rate = settings.get("local_classifier_audit_rate", 0.05)
+
+    if not settings.get("local_classifier_enabled", True) or _model.n_samples < min_samples:
+        return [], tweets, {}
+
+    allowed = {c["key"] for c in settings.get("categories") or []} - {"must_read"}
+    predicted = _model.predict([_tweet_features(t) for t in tweets])
+    predictions = {}
+
+    confident, uncertain = [], []
+    for t, (category, prob) in zip(tweets, predicted):
+        is_confident = prob >= threshold and category in allowed
+        predictions[t["id"]] = (category, is_confident)
+        if is_confident and random.random() >= audit_rate:
+            confident.append({**t, "category": category, "confidence": prob})
+        else:
+            uncertain.append(t)
+
+    _stats["local_labelled"] += len(confident)
+    _stats["sent_to_llm"] += len(uncertain)
+    return confident, uncertain, predictions
+
+
+def record_agreement(predictions: dict, llm_labels: dict):
+    """Compare the LLM's labels with the local guesses from split_confident.
+
+    Audited tweets, the confident ones sent to the LLM anyway, are counted
+    separately: their agreement estimates the accuracy of the local labels
+    that were kept, while uncertain tweets would drag the overall rate down.
+    """
+    for tweet_id, llm_category in llm_labels.items():
+        if tweet_id not in predictions:
+            continue
+        local_category, audited = predictions[tweet_id]
+        agreed = local_category == llm_category
+        per_cat = _stats["by_category"].setdefault(
+            llm_category, {"compared": 0, "agreed": 0, "audited": 0, "audit_agreed": 0}
+        )
+        for d in (_stats, per_cat):
+            d["compared"] += 1
+            d["agreed"] += agreed
+            if audited:
+                d["audited"] += 1
+                d["audit_agreed"] += agreed
+
+
+def get_stats() -> dict:
+    def rate(agreed, compared):
+        return round(agreed / compared, 3) if compared else None
+
+    def rates(d):
+        return {
+            "agreement": rate(d["audit_agreed"], d["audited"]),
+            "overall_agreement": rate(d["agreed"], d["compared"]),
+        }
+
+    return {
+        "trained_on": _model.n_samples,
+        "classes": list(_model.classes),
+        "local_labelled": _stats["local_labelled"],
+        "sent_to_llm": _stats["sent_to_llm"],
+        "compared": _stats["compared"],
+        "audited": _stats["audited"],
+        **rates(_stats),
+        "by_category": {
+            cat: {**d, **rates(d)} for cat, d in _stats["by_category"].items()
+        },
+    }
@@ -0,0 +1,113 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# Weight given to the latest observation in the new-entries-per-minute average
+RATE_SMOOTHING = 0.3
+# Aim to pick up roughly this many new tweets per poll on an active list
+TARGET_NEW_PER_POLL = 5
+# Randomly stretch/shrink each delay by up to this fraction so lists don't poll in lockstep
+JITTER_FRACTION = 0.1
+
+
+@dataclass
+class ListPollState:
+    list_id: str
+    interval_minutes: float | None = None
+    new_per_minute: float | None = None
+    consecutive_errors: int = 0
+    last_polled_at: datetime | None = None
+    next_poll_at: datetime | None = None
+
+
+_states: dict[str, ListPollState] = {}
+
+
+def get_state(list_id: str) -> ListPollState:
+    if list_id not in _states:
+        _states[list_id] = ListPollState(list_id=list_id)
+    return _states[list_id]
+
+
+def record_poll(list_id: str, new_count: int | None):
+    """Record the outcome of polling a list. new_count is None when the fetch failed."""
+    state = get_state(list_id)
+    now = datetime.now(timezone.utc)
+
+    if new_count is None:
+        state.consecutive_errors += 1
+        return
+
+    state.consecutive_errors = 0
+    if state.last_polled_at is not None:
+        elapsed = (now - state.last_polled_at).total_seconds() / 60
+        if elapsed > 0:
+            observed = new_count / elapsed
+            if state.new_per_minute is None:
+                state.new_per_minute = observed
+            else:
+                state.new_per_minute = (
+                    RATE_SMOOTHING * observed
+                    + (1 - RATE_SMOOTHING) * state.new_per_minute
+                )
+    # The first poll of a list returns the whole feed, so it only sets the baseline
+    state.last_polled_at = now
+
+
+def next_interval(list_id: str, settings: dict) -> float:
+    """Work out how many minutes to wait before polling a list again."""
+    state = get_state(list_id)
+    base = settings.get("poll_interval_minutes", 12)
+    min_interval = settings.get("poll_min_interval_minutes", 2)
+    max_interval = max(settings.get("poll_max_interval_minutes", 30), min_interval)
+
+    if state.consecutive_errors:
+        # Exponential backoff while the feed keeps failing
+        interval = base * 2 ** state.consecutive_errors
+    elif state.new_per_minute is None:
+        interval = base
+    elif state.new_per_minute <= 0:
+        interval = max_interval
+    else:
+        interval = TARGET_NEW_PER_POLL / state.new_per_minute
+
+    interval = min(max(interval, min_interval), max_interval)
+    state.interval_minutes = interval
+    return interval
+
+
+def with_jitter(minutes: float) -> float:
+    return minutes * random.uniform(1 - JITTER_FRACTION, 1 + JITTER_FRACTION)
+
+
+def mark_scheduled(list_id: str, run_at: datetime):
+    get_state(list_id).next_poll_at = run_at
+
+
+def forget_lists(keep: list[str]):
+    for list_id in list(_states):
+        if list_id not in keep:
+            del _states[list_id]
+
+
+def snapshot(list_ids: list[str]) -> dict[str, dict]:
+    """Effective schedule per list, for display on the Settings page."""
+    result = {}
+    for list_id in list_ids:
+        state = _states.get(list_id)
+        if state is None:
+            continue
+        result[list_id] = {
+            "interval_minutes": (
+                round(state.interval_minutes, 1)
+                if state.interval_minutes is not None else None
+            ),
+            "new_per_hour": (
+                round(state.new_per_minute * 60, 1)
+                if state.new_per_minute is not None else None
+            ),
+            "consecutive_errors": state.consecutive_errors,
+            "last_polled_at": state.last_polled_at.isoformat() if state.last_polled_at else None,
+            "next_poll_at": state.next_poll_at.isoformat() if state.next_poll_at else None,
+        }
+    return result
@@ -1,17 +1,24 @@
+import asyncio
 import json
 import logging
 from datetime import datetime, timezone
 from time import mktime
 
-import feedparser
 import httpx
 
 from app.config import settings
 from app.database import get_db, get_setting
+from app.services import events
+from app.services.diagnostics import profile_target
 from app.services.classifier import classify_tweets
+from app.services.poll_scheduler import record_poll
+from app.services.summarizer import update_rolling_summaries
 
 logger = logging.getLogger(__name__)
 
+# Per-list polls run independently, so only one of them classifies at a time
+_classify_lock = asyncio.Lock()
+
 
 def _parse_author(entry: dict) -> str:
     """Extract Twitter handle from a feed entry."""
@@ -56,18 +63,21 @@ def _parse_entry(entry, fallback_author: str = "") -> dict:
     }
 
 
-async def fetch_list_feed(list_id: str) -> list[dict]:
+async def fetch_list_feed(list_id: str) -> list[dict] | None:
+    """Fetch a list feed, returning None if the request itself failed."""
     url = f"{settings.rsshub_base_url}/twitter/list/{list_id}"
     async with httpx.AsyncClient(timeout=30, follow_redirects=False) as client:
         try:
             resp = await client.get(url)
             if resp.status_code in (301, 302, 307, 308):
                 logger.error(f"List feed {list_id} redirected to {resp.headers.get('location')} — check RSSHUB_BASE_URL")
-                return []
+                return None
             resp.raise_for_status()
         except httpx.HTTPError as e:
             logger.error(f"Failed to fetch list feed {list_id}: {e}")
-            return []
+            return None
+
+    import feedparser  # Deferred: slow to import and not needed until the first poll
 
     feed = feedparser.parse(resp.text)
     if not feed.entries:
@@ -79,19 +89,25 @@ async def fetch_list_feed(list_id: str) -> list[dict]:
     return tweets
 
 
-async def poll_feeds() -> list[dict]:
-    list_ids = await get_setting("twitter_list_ids") or []
-
-    if not list_ids:
-        logger.info("No twitter_list_ids configured. Add list IDs in Settings > Advanced.")
-        return []
+@profile_target("poll")
+async def poll_list(list_id: str) -> int | None:
+    """Poll a single list and classify anything new.
 
-    all_tweets = []
-    for list_id in list_ids:
-        tweets = await fetch_list_feed(list_id)
-        all_tweets.extend(tweets)
+    Returns the number of new tweets, or None if the feed could not be fetched.
+    """
+    tweets = await fetch_list_feed(list_id)
+    if tweets is None:
+        record_poll(list_id, None)
+        events.publish("poll", {"stage": "list_failed", "list_id": list_id})
+        return None
 
-    return all_tweets
+    new_tweets = await store_tweets(tweets)
+    record_poll(list_id, len(new_tweets))
+    events.publish("poll", {"stage": "list_fetched", "list_id": list_id, "new": len(new_tweets)})
+    await tag_must_reads()
+    await classify_pending()
+    await update_rolling_summaries()
+    return len(new_tweets)
 
 
 async def store_tweets(tweets: list[dict]) -> list[dict]:
@@ -99,15 +115,11 @@ async def store_tweets(tweets: list[dict]) -> list[dict]:
     now = datetime.now(timezone.utc).isoformat()
     new_tweets = []
 
+    # Lists are polled concurrently and can share tweets, so let SQLite skip
+    # duplicates rather than checking first and racing another poll's insert
     for tweet in tweets:
-        existing = await db.execute_fetchall(
-            "SELECT id FROM tweets WHERE id = ?", (tweet["id"],)
-        )
-        if existing:
-            continue
-
-        await db.execute(
-            """INSERT INTO tweets (id, author, content, content_text, media_urls, tweet_url, published_at, fetched_at)
+        cursor = await db.execute(
+            """INSERT OR IGNORE INTO tweets (id, author, content, content_text, media_urls, tweet_url, published_at, fetched_at)
                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 tweet["id"],
@@ -120,7 +132,8 @@ async def store_tweets(tweets: list[dict]) -> list[dict]:
                 now,
             ),
         )
-        new_tweets.append(tweet)
+        if cursor.rowcount:
+            new_tweets.append(tweet)
 
     await db.commit()
     logger.info(f"Stored {len(new_tweets)} new tweets out of {len(tweets)} fetched")
@@ -149,21 +162,56 @@ async def tag_must_reads():
     await db.commit()
 
 
+async def classify_pending() -> int:
+    """Classify all untagged tweets not yet in a briefing. Returns how many were sent."""
+    async with _classify_lock:
+        db = await get_db()
+        rows = await db.execute_fetchall(
+            """SELECT id, author, content_text, media_urls
+               FROM tweets WHERE category IS NULL AND briefing_id IS NULL"""
+        )
+        unclassified = [dict(row) for row in rows]
+
+        if unclassified:
+            await classify_tweets(unclassified)
+
+    return len(unclassified)
+
+
+@profile_target("poll")
 async def poll_and_classify():
     logger.info("Starting poll cycle")
-    tweets = await poll_feeds()
-    new_tweets = await store_tweets(tweets)
-    await tag_must_reads()
-
-    # Classify untagged tweets
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        """SELECT id, author, content_text, media_urls
-           FROM tweets WHERE category IS NULL AND briefing_id IS NULL"""
-    )
-    unclassified = [dict(row) for row in rows]
+    list_ids = await get_setting("twitter_list_ids") or []
+    events.publish("poll", {"stage": "started", "lists": len(list_ids)})
 
-    if unclassified:
-        await classify_tweets(unclassified)
+    if not list_ids:
+        logger.info("No twitter_list_ids configured. Add list IDs in Settings > Advanced.")
 
-    logger.info(f"Poll cycle complete. {len(new_tweets)} new, {len(unclassified)} classified.")
+    try:
+        # Poll list by list so the adaptive scheduler still sees per-list activity
+        new_count = 0
+        for i, list_id in enumerate(list_ids, 1):
+            tweets = await fetch_list_feed(list_id)
+            if tweets is None:
+                record_poll(list_id, None)
+                events.publish("poll", {
+                    "stage": "list_failed", "list_id": list_id, "done": i, "lists": len(list_ids),
+                })
+                continue
+            new_tweets = await store_tweets(tweets)
+            record_poll(list_id, len(new_tweets))
+            new_count += len(new_tweets)
+            events.publish("poll", {
+                "stage": "list_fetched", "list_id": list_id, "new": len(new_tweets),
+                "done": i, "lists": len(list_ids),
+            })
+
+        await tag_must_reads()
+        classified = await classify_pending()
+        await update_rolling_summaries()
+    except Exception:
+        events.publish("poll", {"stage": "failed"})
+        raise
+
+    events.publish("poll", {"stage": "finished", "new": new_count, "classified": classified})
+    logger.info(f"Poll cycle complete. {new_count} new, {classified} classified.")
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.database import get_all_settings, get_db
+from app.services.gemini import generate_config, get_client
+
+logger = logging.getLogger(__name__)
+
+# Categories never worth summarising
+EXCLUDED_CATEGORIES = ("skip",)
+# Tweets folded into a category summary per LLM call
+CHUNK_SIZE = 100
+# Category summaries updated in parallel
+MAX_CONCURRENCY = 4
+
+CATEGORY_PROMPT = """You maintain a running summary of tweets in the "{label}" section of a financial/tech Twitter briefing.
+
+You are given the current summary (possibly empty) and a JSON array of new tweets.
+Return an updated summary that folds in anything new and noteworthy: key themes, tickers, names and claims.
+Keep it to at most 5 short bullet points starting with "- ". Drop repetition and noise.
+Return only the bullet points."""
+
+BRIEFING_PROMPT = """You write the opening summary of a financial/tech Twitter briefing.
+
+You are given per-section summaries. Merge them into a short overview of at most 6 bullet points
+starting with "- ", leading with the most important items. Don't invent anything not in the input.
+Return only the bullet points."""
+
+_lock = asyncio.Lock()
+
+
+async def _generate(model: str, system_prompt: str, contents: str) -> str:
+    response = await get_client().aio.models.generate_content(
+        model=model,
+        contents=contents,
+        config=generate_config(
+            system_instruction=system_prompt,
+            temperature=0.2,
+        ),
+    )
+    return (response.text or "").strip()
+
+
+async def _summarize_category(
+    model: str,
+    label: str,
+    previous: str,
+    tweets: list[dict],
+) -> str:
+    summary = previous
+    prompt = CATEGORY_PROMPT.format(label=label)
+    for i in range(0, len(tweets), CHUNK_SIZE):
+        chunk = [
+            {"author": t["author"], "text": t["content_text"]}
+            for t in tweets[i : i + CHUNK_SIZE]
+        ]
+        contents = f"Current summary:\n{summary or '(empty)'}\n\nNew tweets:\n{json.dumps(chunk)}"
+        summary = await _generate(model, prompt, contents)
+    return summary
+
+
+async def update_rolling_summaries():
+    """Fold newly classified tweets into the cached per-category summaries.
+
+    Runs between briefings so that generate_briefing only has to merge them.
+    """
+    if not settings.gemini_api_key:
+        return
+
+    async with _lock:
+        db = await get_db()
+        app_settings = await get_all_settings()
+        model = app_settings.get("gemini_model") or "gemini-2.5-flash"
+        labels = {c["key"]: c["label"] for c in app_settings.get("categories") or []}
+
+        placeholders = ",".join("?" for _ in EXCLUDED_CATEGORIES)
+        rows = await db.execute_fetchall(
+            f"""SELECT id, author, content_text, category FROM tweets
+                WHERE briefing_id IS NULL AND category IS NOT NULL
+                AND category NOT IN ({placeholders})
+                ORDER BY published_at ASC""",
+            EXCLUDED_CATEGORIES,
+        )
+        pending: dict[str, list[dict]] = {}
+        for row in rows:
+            pending.setdefault(row["category"], []).append(dict(row))
+
+        cached = {
+            row["category"]: (row["summary"], set(json.loads(row["tweet_ids"])))
+            for row in await db.execute_fetchall(
+                "SELECT category, summary, tweet_ids FROM category_summaries"
+            )
+        }
+
+        work = {}
+        for category, tweets in pending.items():
+            summary, included = cached.get(category, ("", set()))
+            current_ids = {t["id"] for t in tweets}
+            if not included <= current_ids:
+                # Tweets were reclassified out of this category, so start again
+                summary, included = "", set()
+            new = [t for t in tweets if t["id"] not in included]
+            if new:
+                work[category] = (summary, new)
+
+        stale = set(cached) - set(pending)
+        if stale:
+            await db.executemany(
+                "DELETE FROM category_summaries WHERE category = ?",
+                [(c,) for c in stale],
+            )
+            await db.commit()
+
+        if not work:
+            return
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+        async def run(category: str, summary: str, new: list[dict]):
+            async with semaphore:
+                try:
+                    updated = await _summarize_category(
+                        model, labels.get(category, category), summary, new
+                    )
+                except Exception as e:
+                    logger.error(f"Summary update for {category} failed: {e}")
+                    return
+            await db.execute(
+                """INSERT OR REPLACE INTO category_summaries (category, summary, tweet_ids, updated_at)
+                   VALUES (?, ?, ?, ?)""",
+                (
+                    category,
+                    updated,
+                    json.dumps([t["id"] for t in pending[category]]),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+        await asyncio.gather(*(run(c, s, new) for c, (s, new) in work.items()))
+        await db.commit()
+        logger.info(f"Updated rolling summaries for {len(work)} categories")
+
+
+async def build_briefing_summary() -> str:
+    """Merge the cached category summaries into the briefing's opening summary."""
+    await update_rolling_summaries()
+
+    db = await get_db()
+    rows = await db.execute_fetchall("SELECT category, summary FROM category_summaries")
+    if not rows:
+        return ""
+
+    app_settings = await get_all_settings()
+    categories = app_settings.get("categories") or []
+    order = {c["key"]: i for i, c in enumerate(categories)}
+    labels = {c["key"]: c["label"] for c in categories}
+    sections = sorted(
+        (row for row in rows if row["summary"]),
+        key=lambda row: order.get(row["category"], len(order)),
+    )
+    merged = "\n\n".join(
+        f"{labels.get(row['category'], row['category'])}:\n{row['summary']}" for row in sections
+    )
+    if not merged:
+        return ""
+
+    try:
+        model = app_settings.get("gemini_model") or "gemini-2.5-flash"
+        return await _generate(model, BRIEFING_PROMPT, merged)
+    except Exception as e:
+        logger.error(f"Briefing summary merge failed, using section summaries: {e}")
+        return merged
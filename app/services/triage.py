@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime, timezone
+
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+MANUAL_REASON = "Manual override"
+# Tweet ids per IN (...) query, kept under SQLite's bound-variable limit
+ID_CHUNK = 500
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+async def reclassify(operations: list[dict]) -> int:
+    """Apply manual reclassifications in one transaction and log them as corrections.
+
+    Each operation is either {"tweet_id": ..., "category": ...} or
+    {"author": ..., "category": ..., "briefing_id": optional}, which moves every
+    tweet by that author (within the briefing, if given). Operations are applied
+    in order, so a later one wins where they overlap. Returns the number of
+    tweets whose category actually changed.
+    """
+    db = await get_db()
+    now = datetime.now(timezone.utc).isoformat()
+
+    targets = {}
+    for op in operations:
+        if op.get("tweet_id"):
+            targets[op["tweet_id"]] = op["category"]
+            continue
+        where = "LOWER(author) = ?"
+        params = [op["author"].lower().lstrip("@")]
+        if op.get("briefing_id") is not None:
+            where += " AND briefing_id = ?"
+            params.append(op["briefing_id"])
+        rows = await db.execute_fetchall(f"SELECT id FROM tweets WHERE {where}", params)
+        for row in rows:
+            targets[row[0]] = op["category"]
+
+    if not targets:
+        return 0
+
+    current = {}
+    for ids in _chunks(list(targets), ID_CHUNK):
+        placeholders = ",".join("?" for _ in ids)
+        rows = await db.execute_fetchall(
+            f"SELECT id, category FROM tweets WHERE id IN ({placeholders})", ids
+        )
+        current.update({row[0]: row[1] for row in rows})
+
+    # Unknown ids are ignored; unchanged ones are still marked as manual so they stick
+    applied = [(tweet_id, targets[tweet_id], old) for tweet_id, old in current.items()]
+    changed = [a for a in applied if a[1] != a[2]]
+
+    await db.executemany(
+        f"UPDATE tweets SET category = ?, category_reason = '{MANUAL_REASON}', confidence = 1.0 WHERE id = ?",
+        [(category, tweet_id) for tweet_id, category, _ in applied],
+    )
+    await db.executemany(
+        """INSERT INTO corrections (tweet_id, old_category, new_category, created_at)
+           VALUES (?, ?, ?, ?)""",
+        [(tweet_id, old, category, now) for tweet_id, category, old in changed],
+    )
+    await db.commit()
+
+    from app.services import local_classifier
+
+    # Manual corrections are the best training data the local classifier gets
+    learned = []
+    changed_ids = [tweet_id for tweet_id, _, _ in changed]
+    for ids in _chunks(changed_ids, ID_CHUNK):
+        placeholders = ",".join("?" for _ in ids)
+        rows = await db.execute_fetchall(
+            f"""SELECT id, author, content_text, media_urls, category FROM tweets
+                WHERE id IN ({placeholders})""",
+            ids,
+        )
+        learned.extend(dict(row) for row in rows)
+    local_classifier.learn(learned)
+
+    logger.info(f"Reclassified {len(changed)} tweets ({len(applied)} requested)")
+    return len(changed)
+
+
+async def get_corrections(after_id: int = 0, limit: int = 500) -> list[dict]:
+    """Corrections logged after after_id, oldest first, for incremental consumers."""
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        "SELECT * FROM corrections WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit),
+    )
+    return [dict(row) for row in rows]
@@ -1,16 +1,82 @@
-async function pollNow() {
+const POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+let pollTimer = null;
+let pendingTweets = 0;
+
+const eventSource = new EventSource('/api/events');
+
+eventSource.addEventListener('poll', (e) => {
+    const data = JSON.parse(e.data);
+    if (data.stage === 'started') {
+        setPolling(true, 'Polling...');
+    } else if (data.stage === 'list_fetched' || data.stage === 'list_failed') {
+        if (data.lists) setPolling(true, `Polling ${data.done}/${data.lists}...`);
+    } else if (data.stage === 'finished') {
+        setPolling(false);
+        showToast(`Poll complete: ${data.new} new, ${data.classified} classified`);
+    } else if (data.stage === 'failed') {
+        setPolling(false);
+        showToast('Poll failed', true);
+    }
+});
+
+eventSource.addEventListener('classify', (e) => {
+    const data = JSON.parse(e.data);
+    if (pollTimer && data.stage === 'batch') {
+        setPolling(true, `Classifying ${data.done}/${data.batches}...`);
+    }
+});
+
+eventSource.addEventListener('tweets', (e) => {
+    const data = JSON.parse(e.data);
+    pendingTweets += data.tweets.filter(t => t.category !== 'skip').length;
+    renderPendingCount();
+});
+
+eventSource.addEventListener('briefing', (e) => {
+    const data = JSON.parse(e.data);
+    const btn = document.getElementById('btn-briefing');
+    if (data.stage === 'summarizing' && btn.disabled) {
+        btn.textContent = `Summarizing ${data.tweets} tweets...`;
+    } else if (data.stage === 'generated') {
+        pendingTweets = 0;
+        renderPendingCount();
+    }
+});
+
+eventSource.addEventListener('reset', () => {
+    // Events were missed while disconnected, so the running count can't be trusted
+    pendingTweets = 0;
+    renderPendingCount();
+});
+
+function renderPendingCount() {
+    const el = document.getElementById('pending-count');
+    if (!el) return;
+    el.textContent = `${pendingTweets} new`;
+    el.title = `${pendingTweets} tweets classified for the next briefing since this page loaded`;
+    el.classList.toggle('hidden', pendingTweets === 0);
+}
+
+function setPolling(active, label) {
     const btn = document.getElementById('btn-poll');
-    btn.disabled = true;
-    btn.textContent = 'Polling...';
+    btn.disabled = active;
+    btn.textContent = active ? label : 'Poll Now';
+    clearTimeout(pollTimer);
+    pollTimer = null;
+    // Don't leave the button stuck if the event stream drops the final event
+    if (active) pollTimer = setTimeout(() => setPolling(false), POLL_TIMEOUT_MS);
+}
+
+async function pollNow() {
+    setPolling(true, 'Polling...');
     try {
         const resp = await fetch('/api/poll-now', { method: 'POST' });
         const data = await resp.json();
-        showToast(data.message || 'Poll complete');
+        if (data.status === 'running') showToast(data.message);
     } catch (e) {
+        setPolling(false);
         showToast('Poll failed', true);
-    } finally {
-        btn.disabled = false;
-        btn.textContent = 'Poll Now';
     }
 }
 
@@ -35,19 +101,82 @@ async function generateBriefing() {
     }
 }
 
-async function reclassifyTweet(tweetId, category) {
+const RECLASSIFY_FLUSH_DELAY_MS = 1500;
+const RECLASSIFY_FLUSH_SIZE = 100;
+
+// Reclassifications are queued and sent in batches rather than one request per change.
+// The queue keeps the order they were made in, since a later change wins where they overlap.
+const reclassifyQueue = new Map();
+let reclassifyTimer = null;
+
+function queueReclassify(key, op) {
+    // Re-adding moves the key to the end, where its latest change belongs
+    reclassifyQueue.delete(key);
+    reclassifyQueue.set(key, op);
+    scheduleReclassifyFlush();
+}
+
+function reclassifyTweet(tweetId, category) {
     if (!category) return;
+    queueReclassify(`tweet\n${tweetId}`, { tweet_id: tweetId, category });
+}
+
+function reclassifyAuthor(author, category, briefingId = null) {
+    if (!author || !category) return;
+    queueReclassify(`author\n${author}\n${briefingId}`, { author, category, briefing_id: briefingId });
+}
+
+function scheduleReclassifyFlush() {
+    clearTimeout(reclassifyTimer);
+    if (reclassifyQueue.size >= RECLASSIFY_FLUSH_SIZE) {
+        flushReclassifications();
+    } else {
+        reclassifyTimer = setTimeout(flushReclassifications, RECLASSIFY_FLUSH_DELAY_MS);
+    }
+}
+
+function takeReclassifyBatch() {
+    const batch = Array.from(reclassifyQueue);
+    reclassifyQueue.clear();
+    return batch;
+}
+
+async function flushReclassifications() {
+    clearTimeout(reclassifyTimer);
+    if (reclassifyQueue.size === 0) return;
+    const batch = takeReclassifyBatch();
     try {
-        const resp = await fetch(`/api/reclassify/${encodeURIComponent(tweetId)}?category=${category}`, {
-            method: 'POST'
+        const resp = await fetch('/api/reclassify', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ operations: batch.map(([, op]) => op) }),
         });
-        if (resp.ok) showToast('Reclassified');
-        else showToast('Failed to reclassify', true);
+        if (resp.status >= 400 && resp.status < 500) {
+            // The server rejected the batch, so retrying it would only block later changes
+            showToast('Failed to reclassify: changes were rejected', true);
+            return;
+        }
+        if (!resp.ok) throw new Error(resp.statusText);
+        const data = await resp.json();
+        showToast(`Reclassified ${data.updated} tweet${data.updated === 1 ? '' : 's'}`);
     } catch (e) {
-        showToast('Failed to reclassify', true);
+        // Put the changes back ahead of any made since and retry them shortly
+        const newer = takeReclassifyBatch();
+        batch.concat(newer).forEach(([key, op]) => { reclassifyQueue.delete(key); reclassifyQueue.set(key, op); });
+        // Always wait before retrying, even with a full queue, so an outage isn't hammered
+        clearTimeout(reclassifyTimer);
+        reclassifyTimer = setTimeout(flushReclassifications, RECLASSIFY_FLUSH_DELAY_MS);
+        showToast('Failed to reclassify, retrying', true);
     }
 }
 
+window.addEventListener('pagehide', () => {
+    if (reclassifyQueue.size === 0) return;
+    const operations = takeReclassifyBatch().map(([, op]) => op);
+    const blob = new Blob([JSON.stringify({ operations })], { type: 'application/json' });
+    navigator.sendBeacon('/api/reclassify', blob);
+});
+
 function showToast(msg, isError = false) {
     const toast = document.getElementById('toast');
     toast.textContent = msg;
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.database import close_db, get_db
+from app.services import triage
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_path", str(tmp_path / "test.db"))
+    return settings.database_path
+
+
+async def _seed(tweets: list[tuple[str, str, str]]):
+    db = await get_db()
+    await db.executemany(
+        """INSERT INTO tweets (id, author, content, content_text, media_urls, tweet_url,
+                               published_at, fetched_at, category)
+           VALUES (?, ?, '', '', '[]', '', '2025-01-01T00:00:00+00:00', '', ?)""",
+        tweets,
+    )
+    await db.commit()
+
+
+async def _categories() -> dict[str, str]:
+    db = await get_db()
+    rows = await db.execute_fetchall("SELECT id, category FROM tweets")
+    return {row[0]: row[1] for row in rows}
+
+
+async def _corrections() -> list[tuple[str, str]]:
+    return [(c["tweet_id"], c["new_category"]) for c in await triage.get_corrections()]
+
+
+def test_tweet_change_after_author_selector_wins(db_path):
+    async def run():
+        try:
+            await _seed([("t1", "bob", "news"), ("t2", "bob", "news")])
+            await triage.reclassify([
+                {"author": "Bob", "category": "funny"},
+                {"tweet_id": "t1", "category": "skip"},
+            ])
+            return await _categories(), await _corrections()
+        finally:
+            await close_db()
+
+    categories, corrections = asyncio.run(run())
+    assert categories == {"t1": "skip", "t2": "funny"}
+    assert sorted(corrections) == [("t1", "skip"), ("t2", "funny")]
+
+
+def test_author_selector_after_tweet_change_wins(db_path):
+    async def run():
+        try:
+            await _seed([("t1", "bob", "news"), ("t2", "bob", "news")])
+            await triage.reclassify([
+                {"tweet_id": "t1", "category": "skip"},
+                {"author": "Bob", "category": "funny"},
+            ])
+            return await _categories()
+        finally:
+            await close_db()
+
+    assert asyncio.run(run()) == {"t1": "funny", "t2": "funny"}